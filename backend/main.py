@@ -23,6 +23,11 @@ CT0 = config["X"]["ct0_1"]
 genai.configure(api_key=GEMINI_KEY)
 model = genai.GenerativeModel("gemini-2.5-flash")
 
+# Tweets per partial summary; each full chunk is summarized while scraping continues.
+# Matches the default limit, so a default request stays a single Gemini call.
+SUMMARY_CHUNK_SIZE = 50
+TOP_TWEETS = 3
+
 # ---------- FASTAPI APP ----------
 app = FastAPI()
 
@@ -36,6 +41,7 @@ app.add_middleware(
 
 # ---------- TWITTER SCRAPER ----------
 async def scrape_tweets(keyword: str, limit: int = 50):
+    """Yields tweet dicts as soon as twscrape returns them."""
     api = API()
     cookies = f"auth_token={AUTH_TOKEN}; ct0={CT0}"
 
@@ -52,28 +58,32 @@ async def scrape_tweets(keyword: str, limit: int = 50):
 
     await api.pool.set_active(USERNAME, active=True)
 
-    tweets = []
+    count = 0
     async for tweet in api.search(keyword, limit=limit):
-        tweets.append(tweet.dict())
+        count += 1
+        yield tweet.dict()
 
-    logging.info(f"Scraped {len(tweets)} tweets for keyword '{keyword}'")
-    return tweets
+    logging.info(f"Scraped {count} tweets for keyword '{keyword}'")
 
 # ---------- TOP TWEETS WITH MEDIA ----------
 def get_top_tweets(tweets: list[dict], top_n: int = 3):
     top = []
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
     for t in tweets:
-        text = t.get("rawContent", "").strip()
-        media_urls = []
+        text = (t.get("rawContent") or "").strip()
+        if not text and "media" not in t:
+            continue
 
-        if "media" in t:
-            for key in ["photos", "videos", "animated"]:
-                media_list = t["media"].get(key, [])
-                media_urls.extend(media_list)
+        media_urls = []
+        media = t.get("media")
+        if media:
+            for key in ("photos", "videos", "animated"):
+                media_urls.extend(media.get(key, []))
 
         tweet_url = t.get("url")
-        logging.info(f"Processing tweet: {tweet_url}")
-        logging.info(f"Media URLs: {media_urls}")
+        if debug:
+            logging.debug(f"Processing tweet: {tweet_url}")
+            logging.debug(f"Media URLs: {media_urls}")
 
         if text or media_urls:
             top.append({
@@ -81,12 +91,14 @@ def get_top_tweets(tweets: list[dict], top_n: int = 3):
                 "tweet_url": tweet_url,
                 "media": media_urls
             })
+            if len(top) >= top_n:
+                break
 
-    logging.info(f"Selected top {len(top[:top_n])} tweets: {[t['tweet_url'] for t in top[:top_n]]}")
-    return top[:top_n]
+    logging.info(f"Selected top {len(top)} tweets: {[t['tweet_url'] for t in top]}")
+    return top
 
 # ---------- SUMMARIZER ----------
-def summarize_tweets(query: str, tweets: list[str]) -> str:
+async def summarize_tweets(query: str, tweets: list[str]) -> str:
     tweets_combined = "\n".join(tweets)
     prompt = f"""
 Role: You are a data & tweet summarizer.
@@ -100,7 +112,27 @@ Task: Summarize these tweets in a **clear Markdown format**:
 - Use `-` for bullet points
 - Use `**` for highlighting
 """
-    response = model.generate_content(prompt)
+    response = await model.generate_content_async(prompt)
+    return response.text.strip()
+
+async def combine_summaries(query: str, partials: list[str]) -> str:
+    if len(partials) == 1:
+        return partials[0]
+
+    partials_combined = "\n\n".join(partials)
+    prompt = f"""
+Role: You are a data & tweet summarizer.
+The searched keyword was: {query}
+
+Partial summaries, each covering a batch of tweets:
+{partials_combined}
+
+Task: Merge these partial summaries into one summary in a **clear Markdown format**:
+- Use `##` for headings
+- Use `-` for bullet points
+- Use `**` for highlighting
+"""
+    response = await model.generate_content_async(prompt)
     return response.text.strip()
 
 # ---------- CHATBOT ----------
@@ -126,19 +158,67 @@ async def summarize(request: Request):
     query = body.get("query")
     limit = body.get("limit", 50)
 
-    tweets = await scrape_tweets(query, limit=limit)
-    if not tweets:
+    # Producer pushes tweet texts into the queue while they are scraped;
+    # consumer summarizes every full chunk without waiting for the scrape to end.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SUMMARY_CHUNK_SIZE * 2)
+    done = object()  # sentinel: tells the consumer the scrape is over
+    top_tweets = []
+    scraped = 0
+    texts_fetched = 0
+
+    async def produce_tweets():
+        nonlocal scraped, texts_fetched
+        async for tweet in scrape_tweets(query, limit=limit):
+            scraped += 1
+            if len(top_tweets) < TOP_TWEETS:
+                top_tweets.extend(get_top_tweets([tweet], top_n=1))
+            if "rawContent" in tweet:
+                texts_fetched += 1
+                await queue.put(tweet.get("rawContent") or "")
+        await queue.put(done)
+
+    async def consume_and_summarize():
+        tasks = []
+        chunk = []
+        try:
+            while True:
+                text = await queue.get()
+                if text is done:
+                    break
+                chunk.append(text)
+                if len(chunk) >= SUMMARY_CHUNK_SIZE:
+                    tasks.append(asyncio.create_task(summarize_tweets(query, chunk)))
+                    chunk = []
+            if chunk:
+                tasks.append(asyncio.create_task(summarize_tweets(query, chunk)))
+            return await asyncio.gather(*tasks)
+        finally:
+            # on error or cancellation, don't leave Gemini calls running without an owner
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    producer = asyncio.create_task(produce_tweets())
+    consumer = asyncio.create_task(consume_and_summarize())
+    try:
+        await asyncio.gather(producer, consumer)
+    except BaseException:
+        # one side failed (or the request was cancelled): stop the other one too
+        producer.cancel()
+        consumer.cancel()
+        await asyncio.gather(producer, consumer, return_exceptions=True)
+        raise
+    partials = consumer.result()
+    if not scraped or not partials:
         logging.info("No tweets returned from scraper")
         return {"error": "No tweets found"}
 
-    tweet_texts = [t.get("rawContent", "") for t in tweets if "rawContent" in t]
-    summary = summarize_tweets(query, tweet_texts)
-    top_tweets = get_top_tweets(tweets, top_n=3)
+    summary = await combine_summaries(query, partials)
 
     return {
         "query": query,
         "summary": summary,
-        "tweets_fetched": len(tweet_texts),
+        "tweets_fetched": texts_fetched,
         "top_tweets": top_tweets
     }
 
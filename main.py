@@ -1,5 +1,5 @@
 import time
-import json
+import orjson
 from configparser import ConfigParser
 from datetime import datetime
 import asyncio
@@ -33,31 +33,31 @@ async def main():
     # Fetch tweets
     tweets = await client.search_tweet(Query, Filter, Limit)
 
-    tweet_data = []
+    # Save to JSON file: write each tweet into the JSON array as soon as it is
+    # processed instead of collecting them all in memory first
+    filename = f"{Query}_tweets.json"
     tweet_count = 0
-    for tweet in tweets:
-        tweet_count += 1
-        print(tweet.text)
-
-        # Save selected fields from tweet object
-        tweet_data.append({
-            "id": tweet.id,
-            "screen_name": tweet.user.screen_name if tweet.user else None,
-            "name": tweet.user.name if tweet.user else None,
-            "text": tweet.text,
-            "created_at": str(tweet.created_at),
-            "like_count": tweet.favorite_count,
-            "retweet_count": tweet.retweet_count,
-            "reply_count": tweet.reply_count,
-            "quote_count": tweet.quote_count,
-            "view_count": tweet.view_count,
-        })  
+    with open(filename, "wb") as f:
+        f.write(b"[")
+        for tweet in tweets:
+            print(tweet.text)
 
-
-    # Save to JSON file
-    filename = f"{Query}_tweets.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(tweet_data, f, ensure_ascii=False, indent=4)
+            # Save selected fields from tweet object
+            record = {
+                "id": tweet.id,
+                "screen_name": tweet.user.screen_name if tweet.user else None,
+                "name": tweet.user.name if tweet.user else None,
+                "text": tweet.text,
+                "created_at": str(tweet.created_at),
+                "like_count": tweet.favorite_count,
+                "retweet_count": tweet.retweet_count,
+                "reply_count": tweet.reply_count,
+                "quote_count": tweet.quote_count,
+                "view_count": tweet.view_count,
+            }
+            f.write((b",\n" if tweet_count else b"\n") + orjson.dumps(record))
+            tweet_count += 1
+        f.write(b"\n]")
 
     print(f'{datetime.now()} - done {tweet_count} tweets found')
     print(f"Tweets saved to {filename}")
@@ -4,14 +4,30 @@
 # spaCy → NLP library for tokenization, POS tagging, named entities, etc.
 import spacy
 
-# pandas → DataFrame library for handling structured data
+# pandas → DataFrame for the tweet data
 import pandas as pd
 
-# tqdm → progress bar for loops and pandas apply()
+# tqdm → progress bar for loops
 from tqdm import tqdm
 
+# numpy → fast array math (softmax over model outputs)
+import numpy as np
+
 # transformers → Hugging Face library for loading pre-trained NLP models
-from transformers import pipeline
+from transformers import AutoConfig, AutoTokenizer
+
+# onnxruntime → runs the exported ONNX model directly
+import onnxruntime as ort
+
+# optimum → exports Hugging Face models to ONNX and runs them on ONNX Runtime
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+# os → file paths for the cached ONNX models
+import os
+
+# functools → lru_cache to load the models only once per process
+import functools
 
 # typing → used for type hints
 from typing import List, Dict, Optional
@@ -19,44 +35,96 @@ from typing import List, Dict, Optional
 # logging → for status and error messages
 import logging
 
-# ThreadPoolExecutor → run multiple tasks in parallel threads for speed
-from concurrent.futures import ThreadPoolExecutor
+# orjson → fast JSON parsing for tweet files
+import orjson
 
 
 # ======== LOGGING CONFIGURATION ========
 # Set logging to INFO level and include timestamps
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-# Enable tqdm for pandas so DataFrame.apply() shows a progress bar
-tqdm.pandas()
 
-
-# ======== LOAD SPACY MODEL ========
-# Load English NLP model, disabling features we don't need (faster)
-# - "lemmatizer" (word root form) → disabled for speed
-# - "textcat" (text classification) → disabled for speed
-nlp = spacy.load("en_core_web_sm", disable=["lemmatizer", "textcat"])
-
-
-# ======== LOAD SENTIMENT ANALYSIS MODEL ========
+# ======== SENTIMENT ANALYSIS MODEL ========
 # We try to load a Twitter-specific sentiment model (CardiffNLP)
 #   It outputs 3 labels: negative, neutral, positive
+# The model runs on ONNX Runtime instead of PyTorch (same labels, faster on CPU).
+# Exporting to ONNX is slow, so the exported model is saved to disk on the
+# first run and loaded directly on later runs.
 model_name = "cardiffnlp/twitter-roberta-base-sentiment"
+ONNX_CACHE_DIR = "./onnx_cardiff"
 
-try:
-    sentiment_pipeline = pipeline(
-        "sentiment-analysis",
-        model=model_name,
-        truncation=True  # cut off texts longer than model's max length
-    )
-except Exception:
-    # If Cardiff model isn't available (e.g., no internet), use fallback SST-2 model
-    #   This fallback only has POSITIVE and NEGATIVE labels
-    sentiment_pipeline = pipeline(
-        "sentiment-analysis",
-        model="distilbert-base-uncased-finetuned-sst-2-english",
-        truncation=True
+# Set USE_INT8=1 to run a dynamically quantized INT8 copy of the model
+# (~4x smaller weights, faster matmuls). Leave it off to compare accuracy.
+USE_INT8 = os.getenv("USE_INT8", "0").lower() in ("1", "true", "yes")
+
+# Tweets are short: 128 tokens covers them and keeps padded batches small
+MAX_SEQ_LENGTH = 128
+
+# Fallback SST-2 model (only POSITIVE and NEGATIVE labels)
+FALLBACK_MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
+FALLBACK_ONNX_CACHE_DIR = "./onnx_sst2"
+
+
+def _export_onnx(model_id: str, cache_dir: str) -> None:
+    """
+    Exports 'model_id' to ONNX and saves it (plus tokenizer) to 'cache_dir'.
+    Does nothing if the exported model is already there.
+    """
+    if os.path.isfile(os.path.join(cache_dir, "model.onnx")):
+        return
+    ort_model = ORTModelForSequenceClassification.from_pretrained(
+        model_id, export=True, provider="CPUExecutionProvider"
     )
+    ort_model.save_pretrained(cache_dir)
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(cache_dir)
+
+
+def _quantize_onnx(cache_dir: str, quant_dir: str) -> None:
+    """
+    Applies dynamic INT8 quantization to the ONNX model in 'cache_dir'
+    and saves the result to 'quant_dir'.
+    Does nothing if the quantized model is already there.
+    """
+    if os.path.isfile(os.path.join(quant_dir, "model_quantized.onnx")):
+        return
+    quantizer = ORTQuantizer.from_pretrained(cache_dir)
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=True)
+    quantizer.quantize(save_dir=quant_dir, quantization_config=qconfig)
+
+
+def _load_sentiment_model(model_id: str, cache_dir: str):
+    """
+    Loads the sentiment model as a raw ONNX Runtime InferenceSession.
+    - First run: export 'model_id' to ONNX and save it to 'cache_dir'
+    - Later runs: load the saved ONNX model from 'cache_dir' (no export)
+    - USE_INT8: load the INT8 copy from '<cache_dir>_int8' instead
+      (falls back to the FP32 model if quantization fails)
+
+    Returns (session, tokenizer, labels) where labels[i] is the model's
+    label name for output column i.
+    """
+    _export_onnx(model_id, cache_dir)
+
+    onnx_path = os.path.join(cache_dir, "model.onnx")
+    if USE_INT8:
+        quant_dir = f"{cache_dir}_int8"
+        try:
+            _quantize_onnx(cache_dir, quant_dir)
+            onnx_path = os.path.join(quant_dir, "model_quantized.onnx")
+        except Exception as e:
+            logging.warning(f"INT8 quantization of {model_id} failed, using the FP32 model: {e}")
+
+    # Let ORT's own thread pool use every core for a single inference call
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = os.cpu_count() or 1
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = ort.InferenceSession(onnx_path, so, providers=["CPUExecutionProvider"])
+
+    # Rust-backed fast tokenizer: encodes a whole list of texts in parallel
+    tok = AutoTokenizer.from_pretrained(cache_dir, use_fast=True)
+    config = AutoConfig.from_pretrained(cache_dir)
+    labels = [config.id2label[i] for i in range(len(config.id2label))]
+    return session, tok, labels
 
 
 # ======== LABEL MAPPING FOR CARDIFF MODEL ========
@@ -69,21 +137,71 @@ LABEL_MAP_CARDIFF = {
 }
 
 
+def _normalize_label(label: str) -> str:
+    """Converts a model label to NEGATIVE / NEUTRAL / POSITIVE when possible."""
+    if label in LABEL_MAP_CARDIFF:
+        return LABEL_MAP_CARDIFF[label]
+    if label.upper() in ("POSITIVE", "NEGATIVE", "NEUTRAL"):
+        return label.upper()
+    return label  # unknown label, keep as is
+
+
+# ======== LOAD MODELS (ONCE PER PROCESS) ========
+@functools.lru_cache(maxsize=1)
+def _load():
+    """
+    Loads the spaCy pipeline and the sentiment model the first time it is
+    called; later calls return the same objects.
+
+    Nothing is loaded at import time. To share one copy of the weights
+    between server workers, call _load() in the app module and start it with
+    gunicorn's --preload (models load once before forking):
+        gunicorn -k uvicorn.workers.UvicornWorker --preload -w N backend.main:app
+
+    Returns (nlp, session, tokenizer, label_arr) where
+    label_arr[i] is the readable label for model output column i.
+    """
+    # Load the English NLP model once
+    # - "lemmatizer" (word root form) → disabled for speed
+    # - "textcat" (text classification) → disabled for speed
+    # Single-text helpers skip more per call (see _KEYWORD_DISABLE / _ENTITY_DISABLE)
+    nlp = spacy.load("en_core_web_sm", disable=["lemmatizer", "textcat"])
+
+    try:
+        _export_onnx(model_name, ONNX_CACHE_DIR)
+        model_id, cache_dir = model_name, ONNX_CACHE_DIR
+    except Exception as e:
+        # If Cardiff model can't be downloaded/exported (e.g., no internet), use fallback SST-2 model
+        #   This fallback only has POSITIVE and NEGATIVE labels
+        logging.warning(f"Could not load {model_name}, falling back to {FALLBACK_MODEL_NAME}: {e}")
+        model_id, cache_dir = FALLBACK_MODEL_NAME, FALLBACK_ONNX_CACHE_DIR
+    # session/tokenizer errors past this point are real errors: they are not hidden by the fallback
+    session, tok, labels = _load_sentiment_model(model_id, cache_dir)
+
+    # numpy array so a whole batch of predictions is mapped with one indexing step
+    label_arr = np.array([_normalize_label(label) for label in labels])
+    return nlp, session, tok, label_arr
+
+
+# Components each single-text helper can skip:
+# - keywords need the parser (for noun chunks) but not NER
+# - entities only need NER; in en_core_web_sm it has its own internal tok2vec,
+#   so the shared tok2vec, tagger, parser and attribute_ruler are not needed
+_KEYWORD_DISABLE = ["ner"]
+_ENTITY_DISABLE = ["tok2vec", "tagger", "parser", "attribute_ruler"]
+
+
 # ======== KEYWORD EXTRACTION FUNCTION ========
-def extract_keywords(text: str) -> List[str]:
+def _keywords_from_doc(doc) -> List[str]:
     """
-    Extracts *unique* noun phrases from text.
+    Extracts *unique* noun phrases from an already parsed spaCy Doc.
     Example: "The red car is fast" → ["red car"]
 
     Steps:
-    1. If empty text → return empty list
-    2. Use spaCy to tokenize and extract noun chunks
-    3. Convert to lowercase, strip spaces
-    4. Remove duplicates while keeping order
+    1. Take the noun chunks spaCy found in the Doc
+    2. Convert to lowercase, strip spaces
+    3. Remove duplicates while keeping order
     """
-    if not text:
-        return []
-    doc = nlp(text)
     chunks = [
         chunk.text.lower().strip()
         for chunk in doc.noun_chunks
@@ -98,27 +216,100 @@ def extract_keywords(text: str) -> List[str]:
     return out
 
 
+def extract_keywords(text: str) -> List[str]:
+    """
+    Extracts *unique* noun phrases from a single text.
+    For many texts use annotate() (one batched pass).
+    """
+    if not text:
+        return []
+    nlp = _load()[0]
+    return _keywords_from_doc(nlp(text, disable=_KEYWORD_DISABLE))
+
+
 # ======== ENTITY EXTRACTION FUNCTION ========
-def extract_entities(text: str) -> List[tuple]:
+def _entities_from_doc(doc) -> List[tuple]:
     """
-    Extracts named entities (like names, places, dates) from text.
+    Extracts named entities (like names, places, dates) from a parsed spaCy Doc.
     Example: "Apple was founded in 1976" → [("Apple", "ORG"), ("1976", "DATE")]
     """
+    return [(ent.text.strip(), ent.label_) for ent in doc.ents]
+
+
+def extract_entities(text: str) -> List[tuple]:
+    """
+    Extracts named entities from a single text.
+    For many texts use annotate() (one batched pass).
+    """
     if not text:
         return []
-    doc = nlp(text)
-    return [(ent.text.strip(), ent.label_) for ent in doc.ents]
+    nlp = _load()[0]
+    return _entities_from_doc(nlp(text, disable=_ENTITY_DISABLE))
+
 
+# ======== BATCHED ANNOTATION (KEYWORDS + ENTITIES + SENTIMENT) ========
+def _annotate_columns(texts: List[str], batch_size: int = 32):
+    """
+    Runs every NLP step over a list of texts in batches and returns four
+    parallel columns: (keywords, entities, labels, scores).
+    labels / scores are numpy arrays; tweets in a failed batch get NEUTRAL / 0.0.
+    """
+    nlp, sentiment_session, sentiment_tokenizer, label_arr = _load()
 
-# ======== BATCHING UTILITY ========
-def _batchify(lst, batch_size):
+    # --- Keywords & entities ---
+    # One nlp.pipe pass (batched, spread over worker processes) gives both the
+    # noun chunks and the entities; cheaper than a keyword pass plus an NER pass
+    logging.info("Extracting keywords and entities...")
+    keywords = []
+    entities = []
+    for d in tqdm(nlp.pipe(texts, batch_size=256, n_process=os.cpu_count() or 1), total=len(texts)):
+        keywords.append(_keywords_from_doc(d))
+        entities.append(_entities_from_doc(d))
+
+    # --- Sentiment analysis ---
+    logging.info(f"Running sentiment analysis in batches of {batch_size} on ONNX Runtime...")
+    # Start with NEUTRAL / 0.0 everywhere; tweets in a failed batch keep these values
+    labels = np.full(len(texts), "NEUTRAL", dtype=object)
+    scores = np.zeros(len(texts), dtype=np.float64)
+
+    try:
+        if texts:
+            # Tokenize every tweet in one fast-tokenizer call, then feed slices of
+            # the arrays to the model (32 x 128 int64 batches stay cache-friendly)
+            enc = sentiment_tokenizer(
+                texts, padding=True, truncation=True, max_length=MAX_SEQ_LENGTH, return_tensors="np"
+            )
+            input_names = [i.name for i in sentiment_session.get_inputs()]
+
+            for start in range(0, len(texts), batch_size):
+                end = start + batch_size
+                try:
+                    feed = {name: enc[name][start:end] for name in input_names}
+                    logits = sentiment_session.run(None, feed)[0]
+
+                    # softmax → probability for each label
+                    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+                    probs = e / e.sum(axis=1, keepdims=True)
+
+                    labels[start:end] = label_arr[probs.argmax(axis=1)]
+                    scores[start:end] = probs.max(axis=1).round(3)  # round score to 3 decimals
+
+                except Exception as e:
+                    logging.error(f"Sentiment batch failed: {e}")
+    except Exception as e:
+        logging.error(f"Sentiment tokenization failed: {e}")
+
+    return keywords, entities, labels, scores
+
+
+def annotate(texts: List[str], batch_size: int = 32) -> List[tuple]:
     """
-    Splits a large list into smaller lists of size 'batch_size'.
-    This is important because sending 1,000+ texts to the model at once
-    will cause memory errors, so we process in smaller chunks.
+    Annotates many texts at once with batched spaCy (nlp.pipe) and ONNX passes.
+    Returns one (keywords, entities, (sentiment, score)) tuple per text.
+    Example: annotate(["Apple is great"]) → [(["apple"], [("Apple", "ORG")], ("POSITIVE", 0.98))]
     """
-    for i in range(0, len(lst), batch_size):
-        yield lst[i:i+batch_size]
+    keywords, entities, labels, scores = _annotate_columns(list(texts), batch_size)
+    return list(zip(keywords, entities, zip(labels.tolist(), scores.tolist())))
 
 
 # ======== MAIN DATA PROCESSING FUNCTION ========
@@ -126,21 +317,21 @@ def process_dataframe(
     raw_tweets: Optional[list] = None,  # raw tweet dicts
     pd_path: Optional[str] = None,      # JSON file path with tweet data
     from_file: bool = False,            # whether to load from file
-    batch_size: int = 64,               # number of tweets per sentiment batch
-    max_workers: int = 4                # number of threads to use
+    batch_size: int = 32                # number of tweets per sentiment batch
 ) -> pd.DataFrame:
     """
     Processes tweet data:
     1. Loads tweets (from list or file)
     2. Extracts keywords and named entities
-    3. Runs sentiment analysis in batches (multi-threaded for speed)
+    3. Runs sentiment analysis in batches on ONNX Runtime (ORT uses all cores)
     4. Adds readable results to DataFrame
     """
 
     # --- Step 1: Load data ---
     if from_file and pd_path:
-        # Load JSON file into DataFrame
-        df = pd.read_json(pd_path, lines=False)
+        # Load JSON file (a list of tweet dicts)
+        with open(pd_path, "rb") as f:
+            df = pd.DataFrame(orjson.loads(f.read()))
         logging.info(f"Loaded DataFrame from {pd_path}, shape={df.shape}")
     else:
         if raw_tweets is None:
@@ -148,81 +339,42 @@ def process_dataframe(
         df = pd.DataFrame(raw_tweets)
         logging.info(f"Created DataFrame from raw tweets, shape={df.shape}")
 
-    # Ensure 'text' column exists (fill with empty strings if missing)
-    df['text'] = df.get('text', pd.Series([""] * len(df))).fillna("").astype(str)
-
-    # --- Step 2: Extract keywords & entities ---
-    logging.info("Extracting keywords and entities...")
-    df['keywords'] = df['text'].progress_apply(extract_keywords)
-    df['entities'] = df['text'].progress_apply(extract_entities)
-
-    # --- Step 3: Sentiment analysis ---
-    logging.info(f"Running sentiment analysis in batches of {batch_size} with {max_workers} workers...")
-    texts = df['text'].tolist()  # list of all tweet texts
-    sentiments = []  # to store sentiment results
-
-    def process_batch(batch):
-        """
-        Processes a single batch of tweets through the model.
-        Returns a list of dicts: {label: str, score: float}
-        """
-        batch_results = []
-        try:
-            res = sentiment_pipeline(batch)
-            for r in res:
-                label = r.get("label", "")
-                score = r.get("score", 0.0)
-
-                # Normalize label names to uppercase
-                if label in LABEL_MAP_CARDIFF:
-                    mapped_label = LABEL_MAP_CARDIFF[label]
-                elif label.upper() in ("POSITIVE", "NEGATIVE", "NEUTRAL"):
-                    mapped_label = label.upper()
-                elif label.lower() in ("positive", "negative", "neutral"):
-                    mapped_label = label.upper()
-                else:
-                    mapped_label = label  # unknown label, keep as is
-
-                batch_results.append({
-                    "label": mapped_label,
-                    "score": round(float(score), 3)  # round score to 3 decimals
-                })
-
-        except Exception as e:
-            logging.error(f"Sentiment batch failed: {e}")
-            # If an error happens, assign NEUTRAL with score 0
-            for _ in batch:
-                batch_results.append({"label": "NEUTRAL", "score": 0.0})
-
-        return batch_results
+    # Ensure text/username/created_at/url columns exist (fill with empty strings if missing)
+    for col in ("text", "username", "created_at", "url"):
+        if col not in df:
+            df[col] = ""
+    df["text"] = df["text"].fillna("").astype(str)
 
-    # Run batches in parallel threads for speed
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for batch_result in executor.map(process_batch, _batchify(texts, batch_size)):
-            sentiments.extend(batch_result)
+    texts = df["text"].tolist()  # list of all tweet texts
 
-    # If something went wrong and results are fewer than tweets → pad with neutral
-    if len(sentiments) < len(df):
-        sentiments.extend([{"label": "NEUTRAL", "score": 0.0}] * (len(df) - len(sentiments)))
+    # --- Step 2 & 3: Keywords, entities and sentiment (see _annotate_columns) ---
+    keywords, entities, labels, scores = _annotate_columns(texts, batch_size)
+    labels = labels.tolist()
+    scores = scores.tolist()
 
-    # --- Step 4: Add sentiment results to DataFrame ---
-    df['sentiment'] = [s['label'] for s in sentiments]
-    df['sentiment_score'] = [s['score'] for s in sentiments]
+    # --- Step 4: Add NLP results to DataFrame ---
+    df["keywords"] = pd.Series(keywords, index=df.index, dtype=object)
+    df["entities"] = pd.Series(entities, index=df.index, dtype=object)
+    df["sentiment"] = labels
+    df["sentiment_score"] = scores
 
     # --- Step 5: Create readable combined output per tweet ---
-    def format_output(row):
-        return {
-            "username": row.get("username", ""),
-            "text": row.get("text", ""),
-            "sentiment": row.get("sentiment", ""),
-            "score": row.get("sentiment_score", 0.0),
-            "keywords": row.get("keywords", []),
-            "entities": row.get("entities", []),
-            "created_at": row.get("created_at", ""),
-            "url": row.get("url", "")
+    # Walk the columns together instead of calling a function per row (df.apply)
+    df["readable_output"] = pd.Series([
+        {
+            "username": username,
+            "text": text,
+            "sentiment": sentiment,
+            "score": score,
+            "keywords": kws,
+            "entities": ents,
+            "created_at": created_at,
+            "url": url,
         }
-
-    df['readable_output'] = df.apply(format_output, axis=1)
+        for username, text, sentiment, score, kws, ents, created_at, url in zip(
+            df["username"], texts, labels, scores, keywords, entities, df["created_at"], df["url"]
+        )
+    ], index=df.index, dtype=object)
 
     logging.info("NLP processing complete.")
     return df
@@ -240,11 +392,13 @@ def get_sentiment_buckets(df: pd.DataFrame) -> Dict[str, list]:
     }
     """
     buckets = {"POSITIVE": [], "NEGATIVE": [], "NEUTRAL": []}
-    for _, row in df.iterrows():
-        sentiment = str(row.get("sentiment", "NEUTRAL")).upper()
+    # Walk the two columns together instead of building a Series per row (iterrows)
+    sentiments = df["sentiment"].astype(str).str.upper() if "sentiment" in df else ["NEUTRAL"] * len(df)
+    texts = df["text"] if "text" in df else [""] * len(df)
+    for sentiment, text in zip(sentiments, texts):
         if sentiment not in buckets:
             # If sentiment is unknown, treat it as NEUTRAL
-            buckets["NEUTRAL"].append(row.get("text", ""))
+            buckets["NEUTRAL"].append(text)
         else:
-            buckets[sentiment].append(row.get("text", ""))
+            buckets[sentiment].append(text)
     return buckets
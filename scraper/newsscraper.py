@@ -1,10 +1,18 @@
 from dotenv import load_dotenv
 import os
+import hashlib
+import asyncio
+import aiohttp
+import aiofiles
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import json
+from selectolax.parser import HTMLParser
+import orjson
 from datetime import datetime
-from newspaper import Article
+from collections import Counter
+import trafilatura
 
 load_dotenv()
 
@@ -13,45 +21,61 @@ API_KEY = os.getenv('NEWSAPI_KEY')
 if not API_KEY:
     print("Warning: NEWSAPI_KEY not found in environment variables.")
 
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+# One shared session for all synchronous requests: connections are kept alive
+# and reused instead of opening a new TCP+TLS connection per request
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+SESSION.headers.update(HEADERS)
+# Max number of article pages downloaded at the same time
+FETCH_CONCURRENCY = 20
+# Downloaded article HTML is kept here so re-runs parse from disk instead of the network
+CACHE_DIR = './cache'
+
 
 def scrape_aljazeera():
     url = 'https://www.aljazeera.com/'
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    r = requests.get(url, headers=headers)
-    soup = BeautifulSoup(r.content, 'html.parser')
+    r = SESSION.get(url, timeout=10)
+    tree = HTMLParser(r.content)
 
     articles = []
-    for item in soup.select('article'):
-        title_tag = item.find('h3')
+    for item in tree.css('article'):
+        title_tag = item.css_first('h3')
         if not title_tag:
             continue
-        title = title_tag.get_text(strip=True)
-        link = item.find('a')
-        url = 'https://www.aljazeera.com' + link['href'] if link else ''
-        snippet_tag = item.find('p')
-        snippet = snippet_tag.get_text(strip=True) if snippet_tag else ''
+        title = title_tag.text(strip=True)
+        link = item.css_first('a')
+        url = 'https://www.aljazeera.com' + (link.attributes.get('href') or '') if link else ''
+        snippet_tag = item.css_first('p')
+        snippet = snippet_tag.text(strip=True) if snippet_tag else ''
         articles.append({'title': title, 'url': url, 'snippet': snippet, 'source': 'Al Jazeera'})
     return articles
 
 
 def scrape_reuters():
     url = 'https://www.reuters.com/'
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    r = requests.get(url, headers=headers)
-    soup = BeautifulSoup(r.content, 'html.parser')
+    r = SESSION.get(url, timeout=10)
+    tree = HTMLParser(r.content)
 
     articles = []
-    for item in soup.select('article.story, div.story-content, div.MediaStoryCard__body__gYzGq'):
-        title_tag = item.find(['h2', 'h3', 'h1'])
+    for item in tree.css('article.story, div.story-content, div.MediaStoryCard__body__gYzGq'):
+        title_tag = item.css_first('h2, h3, h1')
         if not title_tag:
             continue
-        title = title_tag.get_text(strip=True)
-        link = item.find('a')
-        url = 'https://www.reuters.com' + link['href'] if link else ''
+        title = title_tag.text(strip=True)
+        link = item.css_first('a')
+        url = 'https://www.reuters.com' + (link.attributes.get('href') or '') if link else ''
         snippet = ''
-        snippet_tag = item.find('p')
+        snippet_tag = item.css_first('p')
         if snippet_tag:
-            snippet = snippet_tag.get_text(strip=True)
+            snippet = snippet_tag.text(strip=True)
         articles.append({'title': title, 'url': url, 'snippet': snippet, 'source': 'Reuters'})
 
     seen = set()
@@ -72,7 +96,7 @@ def search_newsapi(query, language='en', page_size=5):
         'sortBy': 'publishedAt',
         'pageSize': page_size,
     }
-    r = requests.get(base_url, params=params)
+    r = SESSION.get(base_url, params=params, timeout=10)
     if r.status_code != 200:
         print(f"NewsAPI error: {r.status_code} - {r.text}")
         return []
@@ -108,79 +132,137 @@ def save_results_to_file(results, query, fetch_full_text=True):
 
     if fetch_full_text:
         print("Fetching full article texts (this may take a while)...")
-        for article in results:
-            full_text = get_full_article_text(article['url'])
+        pages = asyncio.run(_fetch_all([article['url'] for article in results]))
+        for article, html in zip(results, pages):
+            if isinstance(html, Exception):
+                print(f"Failed to fetch article {article['url']}: {html}")
+                html = None
+            full_text = get_full_article_text(article['url'], html=html) if html else None
             article['full_text'] = full_text if full_text else ""
 
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=4)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
     print(f"Saved {len(results)} results to {filename}\n")
 
 
 def save_scraped_headlines(articles):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"scraped_headlines_{timestamp}.json"
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, ensure_ascii=False, indent=4)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(articles, option=orjson.OPT_INDENT_2))
     print(f"Saved all scraped headlines to {filename}\n")
 
 
-def get_full_article_text(url):
-    # Try with newspaper3k first
+def _cache_path(url):
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html')
+
+
+async def _fetch(session, url):
+    # Cached pages are read without blocking the event loop, so many of them
+    # are read at the same time as the remaining downloads.
+    path = _cache_path(url)
+    if os.path.isfile(path):
+        async with aiofiles.open(path, 'rb') as f:
+            return await f.read()
+
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=10), headers=HEADERS) as r:
+        if r.status != 200:
+            print(f"Failed to fetch article: HTTP {r.status}")
+            return None
+        html = await r.read()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    async with aiofiles.open(path, 'wb') as f:
+        await f.write(html)
+    return html
+
+
+async def _fetch_all(urls):
+    # Download (or read from cache) all pages concurrently, at most FETCH_CONCURRENCY at a time.
+    # Results keep the order of 'urls'; failed downloads come back as exceptions.
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    async with aiohttp.ClientSession() as session:
+        async def bound(u):
+            async with sem:
+                return await _fetch(session, u)
+        return await asyncio.gather(*(bound(u) for u in urls), return_exceptions=True)
+
+
+def get_full_article_text(url, html=None):
+    # If the page was already downloaded, pass it as html to skip fetching it again.
+    # The same html is shared by every extraction attempt below.
+    if not html:
+        try:
+            r = SESSION.get(url, timeout=10)
+        except Exception as e:
+            print(f"Failed to fetch article: {e}")
+            return None
+        if r.status_code != 200:
+            print(f"Failed to fetch article: HTTP {r.status_code}")
+            return None
+        html = r.content
+
+    # Try with trafilatura first
     try:
-        article = Article(url)
-        article.download()
-        article.parse()
-        text = article.text
-        if text.strip():
+        text = trafilatura.extract(html, include_comments=False, favor_precision=True)
+        if text and text.strip():
             return text
     except Exception as e:
-        print(f"Newspaper3k extraction failed: {e}")
+        print(f"Trafilatura extraction failed: {e}")
 
     # Fallback: custom scraping for known sites or generic heuristic for others
-    headers = {'User-Agent': 'Mozilla/5.0'}
     try:
-        r = requests.get(url, headers=headers, timeout=10)
-        if r.status_code != 200:
-            print(f"Failed to fetch article: HTTP {r.status_code}")
-            return None
-        soup = BeautifulSoup(r.content, 'html.parser')
+        try:
+            tree = HTMLParser(html)
+        except Exception as e:
+            # Last resort: Python's html.parser is slow but accepts almost anything
+            print(f"selectolax could not parse the page ({e}), using BeautifulSoup")
+            soup = BeautifulSoup(html, 'html.parser')
+            container = soup.find('article') or soup
+            article_text = '\n\n'.join(p.get_text(strip=True) for p in container.find_all('p'))
+            return article_text if article_text.strip() else None
 
         # Site-specific fallbacks:
         if 'aljazeera.com' in url:
-            paragraphs = soup.select('div.wysiwyg.wysiwyg--all-content.css-1ck9wyi p')
+            paragraphs = tree.css('div.wysiwyg.wysiwyg--all-content.css-1ck9wyi p')
             if not paragraphs:
-                paragraphs = soup.select('div.article-p-wrapper p')
-            article_text = '\n\n'.join(p.get_text(strip=True) for p in paragraphs)
+                paragraphs = tree.css('div.article-p-wrapper p')
+            article_text = '\n\n'.join(p.text(strip=True) for p in paragraphs)
             if article_text.strip():
                 return article_text
 
         elif 'reuters.com' in url:
-            paragraphs = soup.select('div.ArticleBody__content__2gQno p')
-            article_text = '\n\n'.join(p.get_text(strip=True) for p in paragraphs)
+            paragraphs = tree.css('div.ArticleBody__content__2gQno p')
+            article_text = '\n\n'.join(p.text(strip=True) for p in paragraphs)
             if article_text.strip():
                 return article_text
 
         # Generic fallback for other sites: get paragraphs inside <article>
-        article_tag = soup.find('article')
+        article_tag = tree.css_first('article')
         if article_tag:
-            paragraphs = article_tag.find_all('p')
-            article_text = '\n\n'.join(p.get_text(strip=True) for p in paragraphs)
+            paragraphs = article_tag.css('p')
+            article_text = '\n\n'.join(p.text(strip=True) for p in paragraphs)
             if article_text.strip():
                 return article_text
 
-        # If no <article> or empty, try div with most paragraphs
-        divs = soup.find_all('div')
+        # If no <article> or empty, try div with most paragraphs.
+        # One pass over the <p> tags counting them per parent div
+        # (instead of searching every div for its paragraphs).
+        p_counts = Counter()
+        parents = {}
+        for p in tree.css('p'):
+            parent = p.parent
+            if parent is not None and parent.tag == 'div':
+                p_counts[parent.mem_id] += 1
+                parents[parent.mem_id] = parent
         max_p_div = None
         max_p_count = 0
-        for div in divs:
-            p_tags = div.find_all('p')
-            if len(p_tags) > max_p_count:
-                max_p_count = len(p_tags)
-                max_p_div = div
+        if p_counts:
+            best_id, max_p_count = p_counts.most_common(1)[0]
+            max_p_div = parents[best_id]
         if max_p_div and max_p_count > 3:
-            paragraphs = max_p_div.find_all('p')
-            article_text = '\n\n'.join(p.get_text(strip=True) for p in paragraphs)
+            paragraphs = max_p_div.css('p')
+            article_text = '\n\n'.join(p.text(strip=True) for p in paragraphs)
             if article_text.strip():
                 return article_text
 
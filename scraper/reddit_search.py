@@ -1,65 +1,97 @@
 # scraper/reddit_search.py
 import os
-import re
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import praw
 from dotenv import load_dotenv
 
+# google-re2 (linear-time regex engine) if installed, stdlib re otherwise
+try:
+    import re2 as re
+except ImportError:
+    import re
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-reddit = praw.Reddit(
-    client_id=os.getenv("CLIENT_ID"),
-    client_secret=os.getenv("CLIENT_SECRET"),
-    user_agent=os.getenv("USER_AGENT", "local-scraper")
-)
+def _new_reddit() -> praw.Reddit:
+    return praw.Reddit(
+        client_id=os.getenv("CLIENT_ID"),
+        client_secret=os.getenv("CLIENT_SECRET"),
+        user_agent=os.getenv("USER_AGENT", "local-scraper")
+    )
+
+reddit = _new_reddit()
+
+# praw.Reddit is not thread-safe: every thread that talks to Reddit gets its own instance
+_local = threading.local()
+
+def _thread_reddit() -> praw.Reddit:
+    if not hasattr(_local, "reddit"):
+        _local.reddit = _new_reddit()
+    return _local.reddit
+
+# compiled once at import; URLs and markdown links are removed in a single pass
+_URL_OR_MD = re.compile(r"http\S+|www\S+|\[.*?\]\(.*?\)")
+_NL = re.compile(r"\n+")
+_WS = re.compile(r"\s{2,}")
 
 def _clean_text(text: str) -> str:
     if not text:
         return ""
-    text = re.sub(r"http\S+|www\S+", "", text)
-    text = re.sub(r"\[.*?\]\(.*?\)", "", text)
-    text = re.sub(r"\n+", " ", text)
-    text = re.sub(r"\s{2,}", " ", text)
-    return text.strip()
+    return _WS.sub(" ", _NL.sub(" ", _URL_OR_MD.sub("", text))).strip()
+
+# posts whose comments are fetched at the same time (network-bound, GIL released).
+# One pool shared by every search, so concurrent queries don't multiply the thread count.
+EXPAND_WORKERS = 8
+_EXPAND_POOL = ThreadPoolExecutor(max_workers=EXPAND_WORKERS, thread_name_prefix="reddit-expand")
+
+def _expand_post(post, comment_limit: int) -> dict:
+    """Build the post dict and fetch up to comment_limit of its comments."""
+    post_data = {
+        "id": post.id,
+        "source": "reddit",
+        "subreddit": str(post.subreddit),
+        "title": _clean_text(post.title),
+        "body": _clean_text(post.selftext),
+        "author": str(post.author),
+        "score": post.score,
+        "created_utc": post.created_utc,
+        "comments": []
+    }
+
+    # Fetch limited comments (safe) through this thread's own Reddit instance;
+    # the fields above come from the search result and need no request
+    try:
+        comments = _thread_reddit().submission(id=post.id).comments
+        comments.replace_more(limit=0)
+        for i, comment in enumerate(comments.list()):
+            if i >= comment_limit:
+                break
+            post_data["comments"].append({
+                "comment_id": comment.id,
+                "body": _clean_text(getattr(comment, "body", "")),
+                "author": str(getattr(comment, "author", "")),
+                "score": getattr(comment, "score", 0),
+                "created_utc": getattr(comment, "created_utc", 0),
+                "parent_id": getattr(comment, "parent_id", "")
+            })
+    except Exception:
+        # swallow comment fetching issues (still keep post)
+        logging.warning(f"Failed to fetch comments for reddit post {post.id}", exc_info=True)
+
+    return post_data
 
 def search_reddit_query(query: str, post_limit: int = 25, comment_limit: int = 30):
     """Return list of posts (with some comments) for the query."""
     results = []
     try:
-        for post in reddit.subreddit("all").search(query, limit=post_limit):
-            post_data = {
-                "id": post.id,
-                "source": "reddit",
-                "subreddit": str(post.subreddit),
-                "title": _clean_text(post.title),
-                "body": _clean_text(post.selftext),
-                "author": str(post.author),
-                "score": post.score,
-                "created_utc": post.created_utc,
-                "comments": []
-            }
-
-            # Fetch limited comments (safe)
-            try:
-                post.comments.replace_more(limit=0)
-                for i, comment in enumerate(post.comments.list()):
-                    if i >= comment_limit:
-                        break
-                    post_data["comments"].append({
-                        "comment_id": comment.id,
-                        "body": _clean_text(getattr(comment, "body", "")),
-                        "author": str(getattr(comment, "author", "")),
-                        "score": getattr(comment, "score", 0),
-                        "created_utc": getattr(comment, "created_utc", 0),
-                        "parent_id": getattr(comment, "parent_id", "")
-                    })
-            except Exception:
-                # swallow comment fetching issues (still keep post)
-                logging.debug("Failed to fetch comments for reddit post", exc_info=True)
-
-            results.append(post_data)
+        # callers may run several searches in threads at once: use this thread's instance
+        posts = list(_thread_reddit().subreddit("all").search(query, limit=post_limit))
+        # comments are fetched for several posts in parallel; map keeps search order
+        results = list(_EXPAND_POOL.map(lambda p: _expand_post(p, comment_limit), posts))
     except Exception as e:
         logging.error(f"Error during Reddit search for '{query}': {e}", exc_info=True)
     return results
@@ -3,11 +3,19 @@ import asyncio
 import os
 import re
 import json
+import orjson
+import time
+import sqlite3
+import hashlib
+import importlib.util
 import logging
+import threading
+from contextlib import closing
+from functools import lru_cache
 from typing import List, Optional
 
 from twscrape import API
-from .text_utils import clean_text, translate_to_english, is_spammy, format_tweet
+from .text_utils import clean_text, translate_to_english, translate_tweets, is_spammy, format_tweet
 from .reddit_search import search_reddit_query
 from config import load_env
 
@@ -19,8 +27,39 @@ try:
 except Exception:
     LLAMA_OK = False
 
+# optional semantic matching of near-duplicate queries in the keyword cache;
+# sentence_transformers (torch + transformers, seconds to import) is only
+# checked for here and imported when the embedder is first needed
+try:
+    import numpy as np
+    EMBED_OK = importlib.util.find_spec("sentence_transformers") is not None
+except Exception:
+    EMBED_OK = False
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+# max keyword searches running at once (keeps the twscrape account pool from being hammered)
+KEYWORD_CONCURRENCY = 3
+# tweets received but not yet formatted (the search pauses when this fills up)
+TWEET_QUEUE_SIZE = 64
+# coroutines filtering/formatting tweets from that queue; each one translates its
+# tweet in a thread, so up to this many translation requests overlap with the search
+TWEET_WORKERS = 4
+
+# LLM keyword results are cached on disk, keyed by the normalized query
+KW_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_kw_cache.sqlite")
+# cosine similarity above which a different query reuses cached keywords
+KW_SEMANTIC_THRESHOLD = 0.92
+
+if LLAMA_OK:
+    # let LangChain memoize identical ChatOllama prompts as well
+    try:
+        from langchain_community.cache import SQLiteCache
+        from langchain_core.globals import set_llm_cache
+        set_llm_cache(SQLiteCache(database_path=os.path.join(os.path.dirname(KW_CACHE_PATH), "_llm_cache.sqlite")))
+    except Exception:
+        logging.debug("LangChain LLM cache not available", exc_info=True)
+
 def sanitize_filename(name: str) -> str:
     return re.sub(r"[^a-zA-Z0-9_\- ]", "_", name).strip()
 
@@ -45,56 +84,144 @@ async def create_api() -> API:
 def _simple_keyword_generation(query: str, max_keywords: int = 6) -> List[str]:
     # fallback: split, plus whole query and some hashtag forms
     tokens = [t.strip() for t in re.split(r"[\s,./]+", query) if len(t.strip()) > 2]
+    ql = query.lower()
     kws = []
     kws.append(query)
     for t in tokens:
-        if t.lower() not in query.lower():
+        if t.lower() not in ql:
             continue
         kws.append(t)
         kws.append(f"#{t}")
         if len(kws) >= max_keywords:
             break
-    # dedupe while preserving order
-    out = []
-    for k in kws:
-        if k not in out:
-            out.append(k)
-    return out[:max_keywords]
+    # dedupe while preserving order (dict keys keep insertion order)
+    return list(dict.fromkeys(kws))[:max_keywords]
+
+def _kw_cache_conn() -> sqlite3.Connection:
+    conn = sqlite3.connect(KW_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS kw ("
+        "qhash TEXT PRIMARY KEY, keywords_json TEXT, embedding BLOB, ts INT)"
+    )
+    return conn
+
+def _query_hash(query: str) -> str:
+    return hashlib.sha1(query.lower().strip().encode("utf-8")).hexdigest()
+
+@lru_cache(maxsize=1)
+def _get_embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+
+def _embed_query(query: str):
+    # normalized, so the dot product of two embeddings is their cosine similarity
+    return _get_embedder().encode(query.lower().strip(), normalize_embeddings=True).astype(np.float32)
+
+def _kw_cache_get(query: str):
+    """
+    Returns (keywords, embedding): the cached keywords for this query (or a
+    near-duplicate one), else None, plus the query embedding if one was
+    computed during the lookup (pass it on to _kw_cache_put).
+    """
+    q = None
+    try:
+        with closing(_kw_cache_conn()) as conn:
+            row = conn.execute("SELECT keywords_json FROM kw WHERE qhash=?", (_query_hash(query),)).fetchone()
+            if row:
+                return json.loads(row[0]), None
+            if not EMBED_OK:
+                return None, None
+            # nothing to compare against: don't load the embedding model yet
+            if not conn.execute("SELECT 1 FROM kw WHERE embedding IS NOT NULL LIMIT 1").fetchone():
+                return None, None
+            q = _embed_query(query)
+            best, best_sim = None, KW_SEMANTIC_THRESHOLD
+            for keywords_json, emb in conn.execute("SELECT keywords_json, embedding FROM kw WHERE embedding IS NOT NULL"):
+                sim = float(np.dot(q, np.frombuffer(emb, dtype=np.float32)))
+                if sim > best_sim:
+                    best, best_sim = keywords_json, sim
+            return (json.loads(best) if best else None), q
+    except Exception:
+        logging.debug("Keyword cache lookup failed", exc_info=True)
+        return None, q
+
+def _kw_cache_put(query: str, keywords: List[str], embedding=None) -> None:
+    try:
+        if embedding is None and EMBED_OK:
+            embedding = _embed_query(query)
+        emb = embedding.tobytes() if embedding is not None else None
+        with closing(_kw_cache_conn()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO kw (qhash, keywords_json, embedding, ts) VALUES (?, ?, ?, ?)",
+                (_query_hash(query), json.dumps(keywords), emb, int(time.time()))
+            )
+    except Exception:
+        logging.debug("Keyword cache store failed", exc_info=True)
+
+# one ChatOllama client per process, created on first use
+_LLM = None
+_LLM_LOCK = threading.Lock()
+
+def _get_llm():
+    global _LLM
+    if _LLM is None:
+        with _LLM_LOCK:
+            if _LLM is None:
+                # small context and output budget: we only want a handful of short phrases
+                _LLM = ChatOllama(
+                    model=os.getenv("OLLAMA_MODEL", "gemma3:1b"),
+                    temperature=0,
+                    num_ctx=2048,
+                    num_predict=128,
+                )
+    return _LLM
+
+@lru_cache(maxsize=8)
+def _keyword_chain(max_keywords: int):
+    # prompt | llm chain, built once per max_keywords value
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are an assistant that converts a user search intent into a short list of concise search phrases suitable for Twitter and Reddit. Return only a newline-separated list of phrases, max {n}."),
+        ("human", "User intent: {q}\nReturn up to {n} search phrases, one per line.")
+    ])
+    return prompt.partial(n=max_keywords) | _get_llm()
+
+def _llm_search_terms(query: str, max_keywords: int) -> List[str]:
+    out = _keyword_chain(max_keywords).invoke({"q": query})
+    raw = getattr(out, "content", str(out)).strip()
+    # try JSON list, newline splitting, or comma splitting
+    if raw.startswith("["):
+        try:
+            parsed = json.loads(raw)
+            if isinstance(parsed, list):
+                return [p.strip() for p in parsed if p and p.strip()][:max_keywords]
+        except Exception:
+            pass
+    # newline split
+    lines = [l.strip() for l in re.split(r"[\r\n]+", raw) if l.strip()]
+    if lines:
+        return lines[:max_keywords]
+    # fallback comma split
+    return [p.strip() for p in raw.split(",") if p.strip()][:max_keywords]
 
 def generate_search_terms(query: str, max_keywords: int = 6, timeout: int = 8) -> List[str]:
     """
     Use a small LLM (Ollama via LangChain) to generate a short list of
     search phrases for Twitter and Reddit. If LLM not available or fails,
     fall back to a simple heuristic.
+    LLM results are cached on disk (exact query match, or a near-duplicate
+    query when sentence-transformers is installed).
     """
     if LLAMA_OK:
+        # the query is embedded at most once: the lookup's embedding is reused when storing
+        cached, embedding = _kw_cache_get(query)
+        if cached:
+            logging.info(f"Using cached search keywords for query: {query}")
+            return cached[:max_keywords]
         try:
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", "You are an assistant that converts a user search intent into a short list of concise search phrases suitable for Twitter and Reddit. Return only a newline-separated list of phrases, max {n}."),
-                ("human", "User intent: {q}\nReturn up to {n} search phrases, one per line.")
-            ])
-            prompt = prompt.partial(n=max_keywords)
-            llm = ChatOllama(model=os.getenv("OLLAMA_MODEL", "gemma3:1b"), temperature=0)
-            chain = prompt | llm
-            out = chain.invoke({"q": query})
-            raw = getattr(out, "content", str(out)).strip()
-            # try JSON list, newline splitting, or comma splitting
-            if raw.startswith("["):
-                try:
-                    import json as _j
-                    parsed = _j.loads(raw)
-                    if isinstance(parsed, list):
-                        return [p.strip() for p in parsed if p and p.strip()][:max_keywords]
-                except Exception:
-                    pass
-            # newline split
-            lines = [l.strip() for l in re.split(r"[\r\n]+", raw) if l.strip()]
-            if lines:
-                return lines[:max_keywords]
-            # fallback comma split
-            parts = [p.strip() for p in raw.split(",") if p.strip()]
-            if parts:
-                return parts[:max_keywords]
+            terms = _llm_search_terms(query, max_keywords)
+            if terms:
+                _kw_cache_put(query, terms, embedding)
+                return terms
         except Exception:
             logging.warning("LLM keyword generation failed - falling back to heuristic", exc_info=True)
 
@@ -102,19 +229,47 @@ def generate_search_terms(query: str, max_keywords: int = 6, timeout: int = 8) -
 
 async def fetch_tweets_for_keyword(api: API, keyword: str, limit: int = 200) -> List[dict]:
     results = []
-    idx = 0
-    async for tweet in api.search(keyword, limit=limit * 2):
+    queue = asyncio.Queue(maxsize=TWEET_QUEUE_SIZE)
+    done = object()  # sentinel: tells a worker to stop
+
+    async def producer():
+        # receives tweets from the search and hands them to the workers
         try:
-            if not is_spammy(tweet):
-                formatted = format_tweet(tweet, keyword, idx)
+            async for tweet in api.search(keyword, limit=limit * 2):
+                if len(results) >= limit:
+                    break
+                await queue.put(tweet)
+        finally:
+            for _ in range(TWEET_WORKERS):
+                await queue.put(done)
+
+    async def worker():
+        while True:
+            tweet = await queue.get()
+            if tweet is done:
+                return
+            if len(results) >= limit:
+                continue  # limit reached: just drain the queue
+            try:
+                if is_spammy(tweet):
+                    continue
+                # filtering and formatting are plain CPU work on the event loop thread,
+                # so len(results) is still the next index when the tweet is appended
+                formatted = format_tweet(tweet, keyword, len(results))
                 # add source tag so later summarizer knows
                 formatted["source"] = "twitter"
                 results.append(formatted)
-                idx += 1
-        except Exception as e:
-            logging.warning(f"Skipped tweet due to formatting error: {e}")
-        if len(results) >= limit:
-            break
+            except Exception as e:
+                logging.warning(f"Skipped tweet due to formatting error: {e}")
+                continue
+            # the blocking part (language detection + translation HTTP call) runs in a
+            # thread: other workers and the search keep going meanwhile
+            try:
+                await asyncio.to_thread(translate_tweets, [formatted])
+            except Exception as e:
+                logging.warning(f"Translation skipped for tweet: {e}")
+
+    await asyncio.gather(producer(), *(worker() for _ in range(TWEET_WORKERS)))
     return results
 
 async def fetch_tweets(query: str, max_results: int = 300, keywords: Optional[List[str]] = None) -> List[dict]:
@@ -135,20 +290,33 @@ async def fetch_tweets(query: str, max_results: int = 300, keywords: Optional[Li
                 logging.warning(f"Skipped tweet due to formatting error: {e}")
             if len(results) >= max_results:
                 break
+        await asyncio.to_thread(translate_tweets, results)
         logging.info(f"Collected {len(results)} tweets for query: {query}")
         return results
 
     # distribute max_results across keywords evenly
     per_kw = max(1, max_results // max(1, len(keywords)))
     logging.info(f"Using {len(keywords)} keywords, ~{per_kw} tweets/keyword target.")
-    for kw in keywords:
-        fetched = await fetch_tweets_for_keyword(api, kw, limit=per_kw)
-        # avoid duplicates by id
-        existing_ids = {r.get("id") for r in results}
+    sem = asyncio.Semaphore(KEYWORD_CONCURRENCY)
+
+    async def _bounded_fetch(kw):
+        async with sem:
+            return await fetch_tweets_for_keyword(api, kw, limit=per_kw)
+
+    # run the keyword searches concurrently, then merge them in keyword order
+    tasks = [asyncio.create_task(_bounded_fetch(kw)) for kw in keywords]
+    batches = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # avoid duplicates by id (first occurrence wins, insertion order kept)
+    seen = set()
+    for kw, fetched in zip(keywords, batches):
+        if isinstance(fetched, Exception):
+            logging.warning(f"Tweet search failed for keyword '{kw}': {fetched}")
+            continue
         for ft in fetched:
-            if ft.get("id") not in existing_ids:
+            if ft.get("id") not in seen:
                 results.append(ft)
-                existing_ids.add(ft.get("id"))
+                seen.add(ft.get("id"))
         if len(results) >= max_results:
             break
 
@@ -161,10 +329,22 @@ def save_tweets(tweets: list, query: str, raw: bool = True):
     safe = sanitize_filename(query)
     filename = f"{safe}_{'raw' if raw else 'processed'}.json"
     path = os.path.join(folder, filename)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(tweets, f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(tweets, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     logging.info(f"Saved {len(tweets)} items to {path}")
 
+def _h64(s: str) -> int:
+    """
+    64-bit FNV-1a hash of a string id (e.g. reddit's "1abcde"), so string ids
+    can live in the same set of small ints as tweet ids. Two different ids
+    collide with probability ~n^2 / 2^65: about 1 in 10^11 for 10k items.
+    """
+    h = 0xcbf29ce484222325
+    for b in s.encode():
+        h ^= b
+        h = (h * 0x100000001b3) & 0xFFFFFFFFFFFFFFFF
+    return h
+
 async def scrape_and_save(query: str, max_results: int = 300, reddit_posts: int = 25, reddit_comments: int = 30, use_llm_keywords: bool = True):
     """
     Top-level combined scraper:
@@ -187,40 +367,51 @@ async def scrape_and_save(query: str, max_results: int = 300, reddit_posts: int
 
     # 3) fetch reddit results per keyword (if any); otherwise use query
     reddit_results = []
-    reddit_qs = keywords or [query]
-    for q in reddit_qs[:3]:  # limit number of different reddit queries to 3
-        try:
-            posts = search_reddit_query(q, post_limit=reddit_posts, comment_limit=reddit_comments)
-            # normalize reddit posts into items with 'text' and meta similar to tweets
-            for p in posts:
-                # Compose a text field for summarization: title + body + top comments
-                comments_text = " ".join([c.get("body", "") for c in p.get("comments", [])[:5]])
-                composed = " ".join([p.get("title", ""), p.get("body", ""), comments_text]).strip()
-                item = {
-                    "id": p.get("post_id"),
-                    "source": "reddit",
-                    "subreddit": p.get("subreddit"),
-                    "text": composed,
-                    "raw_text": composed,
-                    "query": q,
-                    "score": p.get("score"),
-                    "created_at": p.get("created_utc"),
-                    "url": f"https://reddit.com/{p.get('post_id')}"
-                }
-                reddit_results.append(item)
-        except Exception:
-            logging.exception("Reddit search failed for query: %s", q)
+    reddit_qs = (keywords or [query])[:3]  # limit number of different reddit queries to 3
+    # PRAW is blocking: run each query in a worker thread so they overlap
+    # with each other instead of stalling the event loop one after another
+    coros = [
+        asyncio.to_thread(search_reddit_query, q, post_limit=reddit_posts, comment_limit=reddit_comments)
+        for q in reddit_qs
+    ]
+    for q, posts in zip(reddit_qs, await asyncio.gather(*coros, return_exceptions=True)):
+        if isinstance(posts, Exception):
+            logging.error("Reddit search failed for query: %s", q, exc_info=posts)
+            continue
+        # normalize reddit posts into items with 'text' and meta similar to tweets
+        for p in posts:
+            # Compose a text field for summarization: title + body + top comments
+            comments_text = " ".join([c.get("body", "") for c in p.get("comments", [])[:5]])
+            composed = " ".join([p.get("title", ""), p.get("body", ""), comments_text]).strip()
+            item = {
+                "id": p.get("id"),
+                "source": "reddit",
+                "subreddit": p.get("subreddit"),
+                "text": composed,
+                "raw_text": composed,
+                "query": q,
+                "score": p.get("score"),
+                "created_at": p.get("created_utc"),
+                "url": f"https://reddit.com/{p.get('id')}"
+            }
+            reddit_results.append(item)
 
     # 4) combine and save: prefer tweets first then reddit
+    # the same post found by several queries is kept once: tweet ids are
+    # already 64-bit ints, other ids are FNV-hashed together with their source
+    seen = set()
     combined = []
     # ensure tweet items have 'text' and 'source' already set in format_tweet
     for t in tweets:
         # format_tweet already sets text, url, etc. ensure source present
         t.setdefault("source", "twitter")
-        combined.append(t)
-
-    for r in reddit_results:
-        combined.append(r)
+    for item in tweets + reddit_results:
+        item_id = item.get("id")
+        key = item_id if isinstance(item_id, int) else _h64(f"{item['source']}:{item_id}")
+        if key in seen:
+            continue
+        seen.add(key)
+        combined.append(item)
 
     # save combined raw
     save_tweets(combined, query, raw=True)
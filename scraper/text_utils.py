@@ -1,5 +1,7 @@
 # scraper/text_utils.py
 import re
+import operator
+from functools import lru_cache
 import emoji
 from langdetect import detect, DetectorFactory
 from deep_translator import GoogleTranslator
@@ -8,27 +10,69 @@ import logging
 DetectorFactory.seed = 0
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+# regexes compiled once at import (these run on every scraped tweet)
+_URL_RE = re.compile(r"https?://\S+")
+# mentions and hashtags removed in a single pass (after urls: "@userhttps://..."
+# must lose the whole url, which a single alternation with urls would not do)
+_TAGS_RE = re.compile(r"@\w+|#\w+")
+_WS_RE = re.compile(r"\s+")
+_ONLY_HASHTAGS_RE = re.compile(r"(#\w+\s*)+")
+
+# every Tweet attribute format_tweet needs, fetched in one C-level call
+_TWEET_GETTER = operator.attrgetter(
+    "id", "rawContent", "likeCount", "retweetCount", "replyCount",
+    "bookmarkCount", "viewCount", "date", "user", "hashtags",
+)
+_DATE_FMT = "%Y-%m-%d %H:%M:%S"
+
+# a pure-ASCII text containing at least two of these is taken as English without
+# langdetect; short words shared with Spanish/Portuguese/French/Roman Urdu
+# ("a", "to", "in", "is", "on", ...) are deliberately left out
+_ENGLISH_STOPS = frozenset({
+    "the", "and", "that", "for", "with", "this", "are", "was", "have", "you",
+    "from", "they", "what", "will", "about", "been", "were", "their", "which",
+})
+_ASCII_WORD_RE = re.compile(r"[a-z]+")
+
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7F]+")
+# deletes the ASCII characters that are not word chars, whitespace or basic punctuation
+_PUNCT_TABLE = str.maketrans("", "", "".join(
+    chr(c) for c in range(128) if re.match(r"[^\w\s.,!?'-]", chr(c))
+))
+
 def clean_text(text: str) -> str:
     if not isinstance(text, str):
         return ""
-    # remove emojis
-    text = emoji.replace_emoji(text, replace="")
-    # remove mentions, urls, preserve hashtags separately
-    text = re.sub(r"https?://\S+", "", text)
-    text = re.sub(r"@\w+", "", text)
-    # keep hashtags list separate; remove raw tags from cleaned text
-    text = re.sub(r"#\w+", "", text)
+    is_ascii = text.isascii()
+    # remove emojis (pure ASCII text cannot contain any)
+    if not is_ascii:
+        text = emoji.replace_emoji(text, replace="")
+    # remove urls, then mentions and hashtags (hashtags are kept separately by format_tweet)
+    text = _TAGS_RE.sub("", _URL_RE.sub("", text))
     # remove non-ascii and weird punctuation, keep basic punctuation
-    text = re.sub(r"[^\x00-\x7F]+", " ", text)
-    text = re.sub(r"[^\w\s.,!?'-]", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    if not is_ascii:
+        text = _NON_ASCII_RE.sub(" ", text)
+    text = text.translate(_PUNCT_TABLE)
+    text = _WS_RE.sub(" ", text).strip()
     return text
 
+@lru_cache(maxsize=2048)
+def _cached_detect(text: str) -> str:
+    # langdetect is slow pure Python; repeated texts (retweets, copies) hit the cache
+    return detect(text)
+
+def _detect_lang(text: str) -> str:
+    # obvious English (ASCII with common stopwords) skips the n-gram classifier
+    if text.isascii() and len(text) > 5 and len(_ENGLISH_STOPS.intersection(_ASCII_WORD_RE.findall(text.lower()))) >= 2:
+        return "en"
+    # the first 120 chars are plenty for detection and keep cache keys small
+    return _cached_detect(text[:120])
+
 def translate_to_english(text: str) -> str:
     try:
         if not text or len(text.strip()) < 3:
             return text
-        lang = detect(text)
+        lang = _detect_lang(text)
         if lang != "en":
             # If translation fails, return original text but log it
             return GoogleTranslator(source="auto", target="en").translate(text)
@@ -36,46 +80,98 @@ def translate_to_english(text: str) -> str:
         logging.debug(f"Translation failed for text (len={len(text)}): {e}")
     return text
 
+def translate_tweets(tweets: list) -> list:
+    """
+    Translates the 'text' of every non-English formatted tweet to English,
+    in place. Language detection runs first, so English tweets are never sent
+    to the translator. translate_batch still makes one request per text; if
+    any of them fails, each text is retried on its own so one bad tweet
+    doesn't leave the whole batch untranslated.
+    """
+    to_translate = []
+    for t in tweets:
+        text = t.get("text") or ""
+        try:
+            if len(text.strip()) >= 3 and _detect_lang(text) != "en":
+                to_translate.append(t)
+        except Exception as e:
+            logging.debug(f"Language detection failed for text (len={len(text)}): {e}")
+    if not to_translate:
+        return tweets
+
+    translator = GoogleTranslator(source="auto", target="en")
+    try:
+        translated = translator.translate_batch([t["text"] for t in to_translate])
+    except Exception as e:
+        logging.debug(f"Batch translation failed for {len(to_translate)} texts, retrying one by one: {e}")
+        translated = []
+        for t in to_translate:
+            try:
+                translated.append(translator.translate(t["text"]))
+            except Exception as e:
+                # If translation fails, keep the original text but log it
+                logging.debug(f"Translation failed for text (len={len(t['text'])}): {e}")
+                translated.append(None)
+    for t, tr in zip(to_translate, translated):
+        if tr:
+            t["text"] = tr
+    return tweets
+
 def is_spammy(tweet) -> bool:
     # tweet.rawContent exists in twscrape Tweet object (based on your code)
     raw = getattr(tweet, "rawContent", "") or ""
-    cleaned = clean_text(raw).lower()
-    if len(cleaned.strip()) < 15:
+    rs = raw.strip()
+    # cheapest checks first; clean_text only runs for tweets that pass them
+    # filter obvious retweets/share patterns
+    if rs[:3].lower() == "rt ":
         return True
-    if raw.count("#") > 6:
+    n_hashtags = raw.count("#")
+    if n_hashtags > 6:
         return True
-    if re.fullmatch(r"(#\w+\s*)+", raw.strip()):
+    if n_hashtags and _ONLY_HASHTAGS_RE.fullmatch(rs):
         return True
     if "http" in raw and len(raw.split()) < 5:
         return True
-    # filter obvious retweets/share patterns
-    if raw.lower().strip().startswith("rt "):
-        return True
-    return False
+    return len(clean_text(raw)) < 15
 
 def format_tweet(tweet, query, index):
-    raw = getattr(tweet, "rawContent", "") or ""
-    cleaned = clean_text(raw)
-    translated = translate_to_english(cleaned)
+    # "text" is the cleaned, untranslated text; run translate_tweets on the
+    # whole batch of formatted tweets afterwards
+    try:
+        tid, raw, likes, rts, reps, bms, views, dt, user, hashtags = _TWEET_GETTER(tweet)
+    except AttributeError:
+        # not a full twscrape Tweet: fall back to per-attribute defaults
+        tid = getattr(tweet, "id", "")
+        raw = getattr(tweet, "rawContent", "")
+        likes = getattr(tweet, "likeCount", 0)
+        rts = getattr(tweet, "retweetCount", 0)
+        reps = getattr(tweet, "replyCount", 0)
+        bms = getattr(tweet, "bookmarkCount", 0)
+        views = getattr(tweet, "viewCount", 0)
+        dt = getattr(tweet, "date", None)
+        user = getattr(tweet, "user", None)
+        hashtags = getattr(tweet, "hashtags", None)
 
-    hashtags = list(getattr(tweet, "hashtags", [])) if hasattr(tweet, "hashtags") else []
-    urls_in_text = re.findall(r"https?://\S+", raw) if raw else []
+    raw = raw or ""
+    cleaned = clean_text(raw)
+    urls_in_text = _URL_RE.findall(raw) if raw else []
+    username = getattr(user, "username", "") if user else ""
 
     return {
-        "id": getattr(tweet, "id", ""),
-        "username": getattr(tweet.user, "username", "") if getattr(tweet, "user", None) else "",
-        "name": getattr(tweet.user, "displayname", "") if getattr(tweet, "user", None) else "",
-        "text": translated,
+        "id": tid,
+        "username": username,
+        "name": getattr(user, "displayname", "") if user else "",
+        "text": cleaned,
         "raw_text": raw,
         "query": query,
         "tweet_count": index + 1,
-        "likes": getattr(tweet, "likeCount", 0),
-        "retweets": getattr(tweet, "retweetCount", 0),
-        "replies": getattr(tweet, "replyCount", 0),
-        "bookmarks": getattr(tweet, "bookmarkCount", 0),
-        "views": getattr(tweet, "viewCount", 0),
-        "created_at": getattr(tweet, "date", None).strftime("%Y-%m-%d %H:%M:%S") if getattr(tweet, "date", None) else "",
-        "hashtags": hashtags,
+        "likes": likes,
+        "retweets": rts,
+        "replies": reps,
+        "bookmarks": bms,
+        "views": views,
+        "created_at": dt.strftime(_DATE_FMT) if dt else "",
+        "hashtags": list(hashtags) if hashtags else [],
         "content_urls": urls_in_text,
-        "url": f"https://twitter.com/{getattr(tweet.user, 'username', '')}/status/{getattr(tweet, 'id', '')}"
+        "url": f"https://twitter.com/{username}/status/{tid}"
     }
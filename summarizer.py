@@ -1,5 +1,6 @@
 import google.generativeai as genai
-import json
+import asyncio
+import orjson
 from twscrape_test import output_file,query
 from configparser import ConfigParser
 
@@ -11,25 +12,23 @@ key = config['X']['gemini_key']
 genai.configure(api_key=key)
 
 # Pick model
-model = genai.GenerativeModel("gemini-2.5-flash")
-
-# Load tweets from JSON file
-with open(f"{output_file}", "r", encoding="utf-8") as f:
-    tweets = json.load(f)
-
-# Extract tweet texts (fallback for both possible keys)
-tweet_texts = [tweet.get("rawContent") or tweet.get("text") for tweet in tweets if tweet.get("rawContent") or tweet.get("text")]
-
-# Combine into one input
-tweets_combined = "\n".join(tweet_texts)
-
-# Prompt Gemini
-prompt = f"""
+MODEL_NAME = "gemini-2.5-flash"
+model = genai.GenerativeModel(MODEL_NAME)
+
+# Tweets per chunk; every chunk is summarized separately, then the partial summaries are merged
+CHUNK_SIZE = 50
+# Max chunk requests in flight at once (keeps us under the free-tier requests-per-minute limit)
+CHUNK_CONCURRENCY = 4
+# Attempts per chunk; waits 2s, 4s, ... between them (e.g. after a 429)
+CHUNK_RETRIES = 3
+
+# Instructions sent before every chunk (far below Gemini's minimum context-cache
+# size, so they are simply sent inline)
+SYSTEM_PROMPT = f"""
 You are a tweet summarizer and trend analyzer.
 The search keyword was: {query}.
 
-Here are the collected tweets:
-{tweets_combined}
+You will receive a batch of collected tweets.
 
 Task:
 1. Summarize the main ideas and opinions in these tweets.
@@ -37,8 +36,79 @@ Task:
 3. Present the summary in a clear, short, bullet-point style.
 """
 
-response = model.generate_content(prompt)
-summary = response.text.strip()
+def _iter_tweets(path):
+    """
+    Yields tweet dicts one at a time, so the whole file is never held in memory.
+    NDJSON files (one tweet per line) are read line by line; older .json files
+    holding one big array are streamed with ijson.
+    """
+    with open(path, "rb") as f:
+        if str(path).endswith(".json"):
+            import ijson
+            yield from ijson.items(f, "item")
+        else:
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # e.g. a last line cut short by a crash mid-write
+                    print(f"Skipping unreadable line {n} in {path}")
+
+
+# Keep only the tweet texts (fallback for both possible keys)
+tweet_texts = [t for t in (tweet.get("rawContent") or tweet.get("text") for tweet in _iter_tweets(output_file)) if t]
+
+if not tweet_texts:
+    raise SystemExit(f"No tweets to summarize in {output_file}")
+
+
+async def summarize_chunk(chunk, sem):
+    """
+    Summarizes one chunk of tweets, retrying with backoff.
+    Returns None if every attempt fails, so one bad chunk doesn't lose the whole summary.
+    """
+    async with sem:
+        for attempt in range(CHUNK_RETRIES):
+            try:
+                response = await model.generate_content_async([SYSTEM_PROMPT, chunk])
+                return response.text.strip()
+            except Exception as e:
+                if attempt + 1 == CHUNK_RETRIES:
+                    print(f"Skipping a chunk after {CHUNK_RETRIES} failed attempts: {e}")
+                    return None
+                await asyncio.sleep(2 ** (attempt + 1))
+
+
+async def summarize_all(texts):
+    # Map: summarize the chunks concurrently (at most CHUNK_CONCURRENCY at a time)
+    sem = asyncio.Semaphore(CHUNK_CONCURRENCY)
+    chunks = ["\n".join(texts[i:i + CHUNK_SIZE]) for i in range(0, len(texts), CHUNK_SIZE)]
+    results = await asyncio.gather(*(summarize_chunk(chunk, sem) for chunk in chunks))
+    partials = [p for p in results if p]
+    if not partials:
+        raise SystemExit("Every chunk failed to summarize")
+    if len(partials) == 1:
+        return partials[0]
+
+    # Reduce: merge the partial summaries into one
+    partials_combined = "\n\n".join(partials)
+    response = await model.generate_content_async(f"""
+You are a tweet summarizer and trend analyzer.
+The search keyword was: {query}.
+
+Here are summaries of separate batches of the collected tweets:
+{partials_combined}
+
+Task:
+Merge them into one summary of the main ideas, opinions and recurring themes,
+in a clear, short, bullet-point style.
+""")
+    return response.text.strip()
+
+
+summary = asyncio.run(summarize_all(tweet_texts))
 
 print("Summary:\n")
 print(summary)
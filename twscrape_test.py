@@ -1,10 +1,11 @@
 import asyncio
-import json
+import orjson
 import logging
 from twscrape import API
 from twscrape.exc import RateLimitError # type: ignore
 from configparser import ConfigParser
 from pathlib import Path
+from datetime import datetime, date
 
 
 # ------------------------------
@@ -26,10 +27,11 @@ accounts = [
 ]
 
 # ------------------------------
-# JSON serializer for datetime
+# JSON serializer for types orjson doesn't know
 # ------------------------------
+# orjson already writes datetimes itself; this default only sees other types
 def tweet_serializer(obj):
-    if hasattr(obj, "isoformat"):
+    if isinstance(obj, (datetime, date)):
         return obj.isoformat()
     return str(obj)
 
@@ -37,14 +39,30 @@ def tweet_serializer(obj):
 # File paths
 # ------------------------------
 query = "pakistan agriculture"
-output_file = Path(f"{query}_tweets.json")
-results = []
+# newline-delimited JSON: one tweet per line, appended as it is scraped
+output_file = Path(f"{query}_tweets.ndjson")
+scraped_ids = set()
 
 if output_file.exists():
-    with open(output_file, "r", encoding="utf-8") as f:
-        results = json.load(f)
-
-scraped_ids = {t["id"] for t in results}
+    with open(output_file, "rb") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                scraped_ids.add(orjson.loads(line)["id"])
+            except (orjson.JSONDecodeError, KeyError, TypeError):
+                # e.g. a last line cut short by a crash mid-write
+                logging.warning(f"Skipping unreadable line {n} in {output_file}")
+
+
+def ensure_trailing_newline(path: Path):
+    """Terminates a partial last line (left by a crash) so the next record starts on its own line."""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, 2)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
 
 # ------------------------------
 # Main scraping function
@@ -73,40 +91,41 @@ async def main():
     total_scraped = 0
     account_index = 0
 
-    while total_scraped < total_limit:
-        acc = accounts[account_index % len(accounts)]
-        await api.pool.set_active(acc["username"], active=True)
-        logging.info(f"🔍 Scraping {per_account_limit} tweets with {acc['username']}")
-
-        scraped_this_account = 0
-        try:
-            async for tweet in api.search(query, limit=per_account_limit * 2):
-                if tweet.id in scraped_ids:
-                    continue
-                tdict = tweet.dict()
-                tdict["scraped_by"] = acc["username"]
-                results.append(tdict)
-                scraped_ids.add(tweet.id)
-                scraped_this_account += 1
-                total_scraped += 1
-
-                if scraped_this_account >= per_account_limit or total_scraped >= total_limit:
-                    break
-
-        except RateLimitError:
-            logging.warning(f"⚠️ Rate limit hit for {acc['username']}, switching account...")
+    # Append new tweets to the file as they arrive
+    ensure_trailing_newline(output_file)
+    with open(output_file, "ab") as out:
+        while total_scraped < total_limit:
+            acc = accounts[account_index % len(accounts)]
+            await api.pool.set_active(acc["username"], active=True)
+            logging.info(f"🔍 Scraping {per_account_limit} tweets with {acc['username']}")
+
+            scraped_this_account = 0
+            try:
+                async for tweet in api.search(query, limit=per_account_limit * 2):
+                    if tweet.id in scraped_ids:
+                        continue
+                    tdict = tweet.dict()
+                    tdict["scraped_by"] = acc["username"]
+                    # append right away: nothing is lost if the scrape crashes
+                    out.write(orjson.dumps(tdict, default=tweet_serializer) + b"\n")
+                    out.flush()
+                    scraped_ids.add(tweet.id)
+                    scraped_this_account += 1
+                    total_scraped += 1
+
+                    if scraped_this_account >= per_account_limit or total_scraped >= total_limit:
+                        break
+
+            except RateLimitError:
+                logging.warning(f"⚠️ Rate limit hit for {acc['username']}, switching account...")
         
-        logging.info(f"✅ Scraped {scraped_this_account} tweets with {acc['username']}")
-        account_index += 1  # move to next account if limit hit or finished
-
-        if total_scraped >= total_limit:
-            break
+            logging.info(f"✅ Scraped {scraped_this_account} tweets with {acc['username']}")
+            account_index += 1  # move to next account if limit hit or finished
 
-    # Save results
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False, default=tweet_serializer)
+            if total_scraped >= total_limit:
+                break
 
-    logging.info(f"✅ Saved {len(results)} tweets to {output_file}")
+    logging.info(f"✅ Appended {total_scraped} tweets to {output_file}")
 
 
 if __name__ == "__main__":
@@ -1,31 +1,66 @@
 # visualizer/summary_visualizer.py
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-import seaborn as sns
+# matplotlib and wordcloud are imported on first plot (see _pyplot),
+# so importing this module without drawing anything stays cheap
 import pandas as pd
 import os
+import re
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+# word pattern WordCloud.process_text uses with its default min_word_length
+_WORD_RE = re.compile(r"\w[\w']*")
+
+_IMPORTED = False
+
+def _pyplot():
+    """Returns matplotlib.pyplot, selecting the Agg backend on the first call."""
+    global _IMPORTED
+    if not _IMPORTED:
+        import matplotlib
+        matplotlib.use("Agg")  # non-GUI backend: plots are only saved to files (also in worker processes)
+        import matplotlib.pyplot as plt
+        plt.rcParams["path.simplify_threshold"] = 1.0  # simplify paths as much as possible: faster rendering
+        _IMPORTED = True
+    import matplotlib.pyplot as plt
+    return plt
+
 def plot_sentiment_pie(df: pd.DataFrame, path: str):
+    plt = _pyplot()
     counts = df["sentiment"].value_counts()
     plt.figure(figsize=(6,6))
-    # choose colors dynamically to avoid mismatches
-    labels = counts.index.tolist()
-    counts.plot.pie(autopct="%1.1f%%", startangle=90)
+    # plain numpy arrays straight to matplotlib (skips pandas' plotting wrapper)
+    plt.pie(counts.to_numpy(), labels=counts.index.to_numpy(), autopct="%1.1f%%", startangle=90)
     plt.title("Sentiment Distribution")
-    plt.ylabel("")
     plt.tight_layout()
     plt.savefig(path)
     plt.close()
 
+def _cloud_words(texts, stopwords):
+    """
+    Yields the words of every tweet after the filters WordCloud.process_text
+    applies: strip a trailing 's, drop pure numbers and stopwords.
+    """
+    for text in texts:
+        for w in _WORD_RE.findall(str(text)):
+            if w.lower().endswith("'s"):
+                w = w[:-2]
+            if not w.isdigit() and w.lower() not in stopwords:
+                yield w
+
 def plot_wordcloud(df: pd.DataFrame, path: str):
-    text = " ".join(df["text"].dropna().tolist())
-    if not text.strip():
+    plt = _pyplot()
+    from wordcloud import WordCloud, STOPWORDS
+    from wordcloud.tokenization import process_tokens
+    # Same counts as WordCloud(collocations=False).process_text on all tweets joined
+    # (most common casing kept, plurals merged), but streamed tweet by tweet
+    # instead of building one big string
+    counts, _ = process_tokens(_cloud_words(df["text"].dropna(), STOPWORDS))
+    if not counts:
         logging.warning("No text to create wordcloud.")
         return
-    wc = WordCloud(width=800, height=400, background_color="white").generate(text)
+    wc = WordCloud(width=800, height=400, background_color="white").generate_from_frequencies(counts)
     plt.figure(figsize=(10,5))
     plt.imshow(wc, interpolation="bilinear")
     plt.axis("off")
@@ -34,14 +69,21 @@ def plot_wordcloud(df: pd.DataFrame, path: str):
     plt.savefig(path)
     plt.close()
 
+def _barh(plt, counts: pd.Series):
+    # horizontal bars drawn with matplotlib directly, most frequent on top
+    pos = range(len(counts))
+    plt.figure(figsize=(10,5))
+    plt.barh(pos, counts.to_numpy())
+    plt.yticks(pos, counts.index.to_numpy())
+    plt.gca().invert_yaxis()
+
 def plot_keywords_bar(df: pd.DataFrame, path: str):
-    all_keywords = [kw for sublist in df["keywords"].dropna() for kw in sublist]
-    if not all_keywords:
+    keywords_series = df["keywords"].dropna().explode().dropna().value_counts().head(15)
+    if keywords_series.empty:
         logging.warning("No keywords to plot.")
         return
-    keywords_series = pd.Series(all_keywords).value_counts().head(15)
-    plt.figure(figsize=(10,5))
-    sns.barplot(x=keywords_series.values, y=keywords_series.index)
+    plt = _pyplot()
+    _barh(plt, keywords_series)
     plt.title("Top Keywords")
     plt.xlabel("Frequency")
     plt.tight_layout()
@@ -49,24 +91,33 @@ def plot_keywords_bar(df: pd.DataFrame, path: str):
     plt.close()
 
 def plot_entities_bar(df: pd.DataFrame, path: str):
-    all_entities = [ent[0] for sublist in df["entities"].dropna() for ent in sublist]
-    if not all_entities:
+    # each entity is a (text, label) pair; count by text
+    entities_series = df["entities"].dropna().explode().dropna().str[0].value_counts().head(15)
+    if entities_series.empty:
         logging.warning("No entities to plot.")
         return
-    entities_series = pd.Series(all_entities).value_counts().head(15)
-    plt.figure(figsize=(10,5))
-    sns.barplot(x=entities_series.values, y=entities_series.index)
+    plt = _pyplot()
+    _barh(plt, entities_series)
     plt.title("Top Named Entities")
     plt.xlabel("Frequency")
     plt.tight_layout()
     plt.savefig(path)
     plt.close()
 
+def _run_plot(job):
+    fn, df, path = job
+    fn(df, path)
+
 def generate_visuals(df: pd.DataFrame, query: str):
     os.makedirs("output/visuals", exist_ok=True)
     safe = "".join(c if c.isalnum() or c in (" ", "_", "-") else "_" for c in query).strip()
-    plot_sentiment_pie(df, f"output/visuals/{safe}_sentiment_pie.png")
-    plot_wordcloud(df, f"output/visuals/{safe}_wordcloud.png")
-    plot_keywords_bar(df, f"output/visuals/{safe}_keywords_bar.png")
-    plot_entities_bar(df, f"output/visuals/{safe}_entities_bar.png")
+    jobs = [
+        (plot_sentiment_pie, df, f"output/visuals/{safe}_sentiment_pie.png"),
+        (plot_wordcloud, df, f"output/visuals/{safe}_wordcloud.png"),
+        (plot_keywords_bar, df, f"output/visuals/{safe}_keywords_bar.png"),
+        (plot_entities_bar, df, f"output/visuals/{safe}_entities_bar.png"),
+    ]
+    # the plots share nothing, so each one renders in its own process
+    with ProcessPoolExecutor(max_workers=len(jobs)) as ex:
+        list(ex.map(_run_plot, jobs))
     logging.info("Visuals saved to output/visuals/")